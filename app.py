@@ -1,7 +1,16 @@
 import os
+import json
 import math
-from functools import reduce
-from flask import Flask, request, jsonify
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import gmpy2
+import numpy as np
+import orjson
+from cachetools import TTLCache
+import sympy
+from numba import njit
+from flask import Flask, request
 import google.generativeai as genai
 from dotenv import load_dotenv
 
@@ -13,10 +22,13 @@ app = Flask(__name__)
 # Global constant
 OFFICIAL_EMAIL = "khushi3860.beai23@chitkara.edu.in"
 
-# Configure Gemini API
+# Configure Gemini API; the model handle is process-invariant, so build
+# it once instead of per request
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
+_GEMINI_MODEL = None
 if GEMINI_API_KEY:
     genai.configure(api_key=GEMINI_API_KEY)
+    _GEMINI_MODEL = genai.GenerativeModel('models/gemma-3-12b-it')
 
 # Input size limits for security
 MAX_ARRAY_SIZE = 1000
@@ -26,60 +38,184 @@ MAX_AI_STRING_LENGTH = 5000
 
 # ==================== HELPER FUNCTIONS ====================
 
-def generate_fibonacci(n):
-    """Generate first N Fibonacci numbers starting from 0."""
-    if n == 0:
-        return []
-    elif n == 1:
-        return [0]
-    
+def _build_fibonacci_cache(n):
+    """Build the first N Fibonacci numbers once at import time."""
     fib_sequence = [0, 1]
     for i in range(2, n):
         fib_sequence.append(fib_sequence[i-1] + fib_sequence[i-2])
-    
     return fib_sequence[:n]
 
 
+# Precomputed once; every request is served by a slice of this list
+_FIB_CACHE = _build_fibonacci_cache(MAX_FIBONACCI_N)
+
+# Fibonacci numbers stay inside int64 through index 92, which covers the
+# common case; orjson serializes this buffer without touching Python ints
+_FIB_CACHE_NP = np.array(_FIB_CACHE[:93], dtype=np.int64)
+
+
+def generate_fibonacci(n):
+    """Return first N Fibonacci numbers starting from 0 (N <= MAX_FIBONACCI_N)."""
+    if n <= len(_FIB_CACHE_NP):
+        return _FIB_CACHE_NP[:n]
+    return _FIB_CACHE[:n]
+
+
+# Sieve of Eratosthenes over odd numbers up to this bound, built lazily on
+# the first prime request and reused for every request after that
+_SIEVE_LIMIT = 10_000_000
+_ODD_SIEVE = None
+
+
+def _get_odd_sieve():
+    """Return (building on first use) a bool array where entry i covers 2*i+1."""
+    global _ODD_SIEVE
+    if _ODD_SIEVE is None:
+        sieve = np.ones(_SIEVE_LIMIT // 2 + 1, dtype=bool)
+        sieve[0] = False  # 1 is not prime
+        for k in range(3, math.isqrt(_SIEVE_LIMIT) + 1, 2):
+            if sieve[k >> 1]:
+                sieve[(k * k) >> 1::k] = False
+        _ODD_SIEVE = sieve
+    return _ODD_SIEVE
+
+
 def is_prime(num):
-    """Check if a number is prime."""
+    """Check if a number is prime via sieve lookup (Miller-Rabin beyond it)."""
     if num < 2:
         return False
     if num == 2:
         return True
     if num % 2 == 0:
         return False
-    
-    for i in range(3, int(math.sqrt(num)) + 1, 2):
-        if num % i == 0:
-            return False
-    return True
+    if num <= _SIEVE_LIMIT:
+        return bool(_get_odd_sieve()[num >> 1])
+    return sympy.isprime(num)
+
+
+@njit(cache=True)
+def _filter_primes_kernel(arr):
+    """Trial-division prime filter compiled to machine code by Numba."""
+    out = np.empty(len(arr), np.int64)
+    count = 0
+    for i in range(len(arr)):
+        num = arr[i]
+        if num < 2:
+            continue
+        if num == 2 or num == 3:
+            out[count] = num
+            count += 1
+            continue
+        if num % 2 == 0 or num % 3 == 0:
+            continue
+        # 6k+-1 wheel: every prime > 3 is adjacent to a multiple of 6,
+        # so only a third of the candidates need a mod
+        prime = True
+        limit = np.int64(math.sqrt(num))
+        j = 5
+        while j <= limit:
+            if num % j == 0 or num % (j + 2) == 0:
+                prime = False
+                break
+            j += 6
+        if prime:
+            out[count] = num
+            count += 1
+    return out[:count]
+
+
+# Warm the JIT once at import so the first request pays no compile cost
+_filter_primes_kernel(np.asarray([2], dtype=np.int64))
 
 
 def filter_primes(numbers):
     """Filter and return only prime numbers from array."""
-    return [num for num in numbers if is_prime(num)]
-
-
-def calculate_gcd(a, b):
-    """Calculate GCD of two numbers."""
-    while b:
-        a, b = b, a % b
-    return abs(a)
+    if not isinstance(numbers, np.ndarray):
+        try:
+            numbers = np.asarray(numbers, dtype=np.int64)
+        except OverflowError:
+            # Elements beyond int64 range: keep the sieve/Miller-Rabin path
+            return [num for num in numbers if is_prime(num)]
+    return _filter_primes_kernel(numbers).tolist()
+
+
+def validate_int_array(value):
+    """Validate an all-integer JSON array in a single C-level pass.
+
+    Returns an int64 ndarray for machine-size input, the original list
+    when elements exceed int64 (arbitrary-precision path), or None when
+    any element is not an integer.
+    """
+    try:
+        arr = np.asarray(value)
+    except ValueError:
+        return None
+    if arr.ndim != 1:
+        return None
+    if arr.dtype == bool:
+        return arr.astype(np.int64)
+    if arr.dtype == np.int64:
+        return arr
+    # Any other inferred dtype gets the per-element check: NumPy infers
+    # uint64 for values in [2**63, 2**64) and promotes to float64 when
+    # magnitudes mix across the int64 boundary, so the fast path alone
+    # cannot tell valid big integers from genuinely non-int input
+    if all(isinstance(x, int) for x in value):
+        return value
+    return None
 
 
 def calculate_hcf(numbers):
     """Calculate HCF (GCD) of all numbers in array."""
-    return reduce(calculate_gcd, numbers)
-
-
-def calculate_lcm_two(a, b):
-    """Calculate LCM of two numbers."""
-    return abs(a * b) // calculate_gcd(a, b)
+    if not isinstance(numbers, np.ndarray):
+        # Beyond-int64 input: GMP's Lehmer GCD beats math.gcd on bignums
+        result = gmpy2.mpz(0)
+        for num in numbers:
+            result = gmpy2.gcd(result, num)
+            if result == 1:
+                break
+        return int(result)
+    result = 0
+    for num in numbers:
+        result = math.gcd(result, num)
+        if result == 1:
+            # GCD can never grow again, skip the remaining elements
+            break
+    return result
 
 
 def calculate_lcm(numbers):
     """Calculate LCM of all numbers in array."""
-    return reduce(calculate_lcm_two, numbers)
+    if not isinstance(numbers, np.ndarray):
+        # Beyond-int64 input: keep the whole reduction inside GMP
+        result = gmpy2.mpz(1)
+        for num in numbers:
+            result = gmpy2.lcm(result, num)
+        return int(result)
+    # Pairwise tree reduction keeps intermediate results balanced in
+    # size, so bignum multiplies stay cheaper than with a left fold
+    items = list(numbers)
+    while len(items) > 1:
+        items = [
+            math.lcm(items[i], items[i + 1]) if i + 1 < len(items) else items[i]
+            for i in range(0, len(items), 2)
+        ]
+    # math.lcm of one argument normalizes sign and NumPy scalars
+    return math.lcm(items[0])
+
+
+# Cache AI answers for repeated queries; guarded by a lock since workers
+# serve requests from multiple threads
+_AI_CACHE = TTLCache(maxsize=4096, ttl=600)
+_AI_CACHE_LOCK = threading.Lock()
+
+# First alphanumeric token of the model's reply, skipping punctuation
+_FIRST_WORD = re.compile(r"[A-Za-z0-9]+")
+
+# Shared pool for upstream Gemini calls so a hung call cannot pin a
+# request thread forever; the timeout bounds worst-case AI latency
+_AI_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+AI_TIMEOUT_SECONDS = 30
 
 
 def get_gemini_response(query):
@@ -87,43 +223,178 @@ def get_gemini_response(query):
     try:
         if not GEMINI_API_KEY:
             return {"error": "Gemini API key not configured", "status": 500}
-        
-        model = genai.GenerativeModel('models/gemma-3-12b-it')
+
+        cache_key = query.strip().lower()
+        with _AI_CACHE_LOCK:
+            cached = _AI_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
         prompt = f"Answer the following question with ONLY ONE WORD, no punctuation, no explanation: {query}"
-        
-        response = model.generate_content(prompt)
-        
+
+        future = _AI_EXECUTOR.submit(_GEMINI_MODEL.generate_content, prompt)
+        try:
+            response = future.result(timeout=AI_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            return {"error": "AI service timed out", "status": 504}
+
         if not response or not response.text:
             return {"error": "No response from AI service", "status": 500}
         
-        # Clean response - remove punctuation and whitespace
-        answer = response.text.strip().strip('.,!?;:"\'-')
-        
-        # Extract first word if multiple words returned
-        answer = answer.split()[0] if answer.split() else answer
-        
-        return {"data": answer}
+        # Extract the first word, dropping punctuation, in a single scan
+        match = _FIRST_WORD.search(response.text)
+        answer = match.group(0) if match else ""
+
+        result = {"data": answer}
+        with _AI_CACHE_LOCK:
+            _AI_CACHE[cache_key] = result
+        return result
     
     except Exception as e:
         return {"error": f"AI service error: {str(e)}", "status": 500}
 
 
+def _json(payload, status_code=200):
+    """Serialize a response body with orjson (C-level JSON encoding)."""
+    try:
+        body = orjson.dumps(payload)
+    except TypeError:
+        # orjson rejects integers beyond 64 bits; the HCF/LCM results can
+        # be arbitrary-precision, so fall back to the stdlib encoder
+        body = json.dumps(payload, separators=(',', ':')).encode()
+    return app.response_class(
+        body,
+        status=status_code,
+        mimetype='application/json'
+    )
+
+
+# The success envelope is constant except for "data", so its serialized
+# prefix is computed once and only the payload is encoded per request
+_SUCCESS_PREFIX = orjson.dumps({
+    "is_success": True,
+    "official_email": OFFICIAL_EMAIL
+})[:-1] + b',"data":'
+
+
 def create_success_response(data):
     """Create standardized success response."""
-    return jsonify({
-        "is_success": True,
-        "official_email": OFFICIAL_EMAIL,
-        "data": data
-    })
+    try:
+        body = _SUCCESS_PREFIX + orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY) + b'}'
+    except TypeError:
+        # Same beyond-64-bit integer fallback as _json
+        body = _SUCCESS_PREFIX + json.dumps(data, separators=(',', ':')).encode() + b'}'
+    return app.response_class(body, mimetype='application/json')
 
 
 def create_error_response(error_message, status_code=400):
     """Create standardized error response."""
-    return jsonify({
+    return _json({
         "is_success": False,
         "official_email": OFFICIAL_EMAIL,
         "error": error_message
-    }), status_code
+    }, status_code)
+
+
+# ==================== OPERATION HANDLERS ====================
+
+def _validate_number_array(value, operation):
+    """Shared array validation for prime/lcm/hcf; returns (numbers, error)."""
+    # Validate type
+    if not isinstance(value, list):
+        return None, create_error_response(f"{operation} requires an array", 422)
+
+    # Validate non-empty
+    if len(value) == 0:
+        return None, create_error_response(f"{operation} requires a non-empty array", 422)
+
+    # Security limit
+    if len(value) > MAX_ARRAY_SIZE:
+        return None, create_error_response(f"Array size must be <= {MAX_ARRAY_SIZE}", 422)
+
+    # Validate all elements are integers
+    numbers = validate_int_array(value)
+    if numbers is None:
+        return None, create_error_response(f"{operation} array must contain only integers", 422)
+
+    return numbers, None
+
+
+def _handle_fibonacci(value):
+    # Validate type
+    if not isinstance(value, int):
+        return create_error_response("fibonacci requires an integer", 422)
+
+    # Validate range
+    if value < 0:
+        return create_error_response("fibonacci requires a non-negative integer", 422)
+
+    # Security limit
+    if value > MAX_FIBONACCI_N:
+        return create_error_response(f"fibonacci N must be <= {MAX_FIBONACCI_N}", 422)
+
+    return create_success_response(generate_fibonacci(value))
+
+
+def _handle_prime(value):
+    numbers, error = _validate_number_array(value, "prime")
+    if error is not None:
+        return error
+
+    return create_success_response(filter_primes(numbers))
+
+
+def _handle_lcm(value):
+    numbers, error = _validate_number_array(value, "lcm")
+    if error is not None:
+        return error
+
+    # Validate no zeros (LCM undefined for zero); ndarray.all() is one
+    # C-level pass and is False exactly when a zero is present
+    has_zero = not numbers.all() if isinstance(numbers, np.ndarray) else 0 in numbers
+    if has_zero:
+        return create_error_response("lcm cannot be calculated with zero values", 422)
+
+    return create_success_response(calculate_lcm(numbers))
+
+
+def _handle_hcf(value):
+    numbers, error = _validate_number_array(value, "hcf")
+    if error is not None:
+        return error
+
+    return create_success_response(calculate_hcf(numbers))
+
+
+def _handle_ai(value):
+    # Validate type
+    if not isinstance(value, str):
+        return create_error_response("AI requires a string", 422)
+
+    # Validate non-empty
+    if len(value.strip()) == 0:
+        return create_error_response("AI requires a non-empty string", 422)
+
+    # Security limit
+    if len(value) > MAX_AI_STRING_LENGTH:
+        return create_error_response(f"AI string must be <= {MAX_AI_STRING_LENGTH} characters", 422)
+
+    ai_result = get_gemini_response(value)
+
+    if "error" in ai_result:
+        return create_error_response(ai_result["error"], ai_result.get("status", 500))
+
+    return create_success_response(ai_result["data"])
+
+
+# Dispatch table: operation key -> handler, replacing the if/elif chain
+_OPERATION_HANDLERS = {
+    "fibonacci": _handle_fibonacci,
+    "prime": _handle_prime,
+    "lcm": _handle_lcm,
+    "hcf": _handle_hcf,
+    "AI": _handle_ai,
+}
 
 
 # ==================== ROUTES ====================
@@ -131,10 +402,10 @@ def create_error_response(error_message, status_code=400):
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({
+    return _json({
         "is_success": True,
         "official_email": OFFICIAL_EMAIL
-    }), 200
+    })
 
 
 @app.route('/bfhl', methods=['POST'])
@@ -156,123 +427,20 @@ def bfhl():
         if len(data) != 1:
             return create_error_response("Request must contain exactly one key", 400)
         
-        # Get the operation key
-        operation = list(data.keys())[0]
+        # Get the operation key without materializing a key list
+        operation = next(iter(data))
         value = data[operation]
-        
-        # Validate allowed operations
-        allowed_operations = ["fibonacci", "prime", "lcm", "hcf", "AI"]
-        if operation not in allowed_operations:
+
+        # Validate allowed operations and dispatch
+        handler = _OPERATION_HANDLERS.get(operation)
+        if handler is None:
             return create_error_response(
-                f"Invalid operation. Allowed: {', '.join(allowed_operations)}", 
+                f"Invalid operation. Allowed: {', '.join(_OPERATION_HANDLERS)}",
                 400
             )
-        
-        # ========== FIBONACCI ==========
-        if operation == "fibonacci":
-            # Validate type
-            if not isinstance(value, int):
-                return create_error_response("fibonacci requires an integer", 422)
-            
-            # Validate range
-            if value < 0:
-                return create_error_response("fibonacci requires a non-negative integer", 422)
-            
-            # Security limit
-            if value > MAX_FIBONACCI_N:
-                return create_error_response(f"fibonacci N must be <= {MAX_FIBONACCI_N}", 422)
-            
-            result = generate_fibonacci(value)
-            return create_success_response(result)
-        
-        # ========== PRIME ==========
-        elif operation == "prime":
-            # Validate type
-            if not isinstance(value, list):
-                return create_error_response("prime requires an array", 422)
-            
-            # Validate non-empty
-            if len(value) == 0:
-                return create_error_response("prime requires a non-empty array", 422)
-            
-            # Security limit
-            if len(value) > MAX_ARRAY_SIZE:
-                return create_error_response(f"Array size must be <= {MAX_ARRAY_SIZE}", 422)
-            
-            # Validate all elements are integers
-            if not all(isinstance(x, int) for x in value):
-                return create_error_response("prime array must contain only integers", 422)
-            
-            result = filter_primes(value)
-            return create_success_response(result)
-        
-        # ========== LCM ==========
-        elif operation == "lcm":
-            # Validate type
-            if not isinstance(value, list):
-                return create_error_response("lcm requires an array", 422)
-            
-            # Validate non-empty
-            if len(value) == 0:
-                return create_error_response("lcm requires a non-empty array", 422)
-            
-            # Security limit
-            if len(value) > MAX_ARRAY_SIZE:
-                return create_error_response(f"Array size must be <= {MAX_ARRAY_SIZE}", 422)
-            
-            # Validate all elements are integers
-            if not all(isinstance(x, int) for x in value):
-                return create_error_response("lcm array must contain only integers", 422)
-            
-            # Validate no zeros (LCM undefined for zero)
-            if 0 in value:
-                return create_error_response("lcm cannot be calculated with zero values", 422)
-            
-            result = calculate_lcm(value)
-            return create_success_response(result)
-        
-        # ========== HCF ==========
-        elif operation == "hcf":
-            # Validate type
-            if not isinstance(value, list):
-                return create_error_response("hcf requires an array", 422)
-            
-            # Validate non-empty
-            if len(value) == 0:
-                return create_error_response("hcf requires a non-empty array", 422)
-            
-            # Security limit
-            if len(value) > MAX_ARRAY_SIZE:
-                return create_error_response(f"Array size must be <= {MAX_ARRAY_SIZE}", 422)
-            
-            # Validate all elements are integers
-            if not all(isinstance(x, int) for x in value):
-                return create_error_response("hcf array must contain only integers", 422)
-            
-            result = calculate_hcf(value)
-            return create_success_response(result)
-        
-        # ========== AI ==========
-        elif operation == "AI":
-            # Validate type
-            if not isinstance(value, str):
-                return create_error_response("AI requires a string", 422)
-            
-            # Validate non-empty
-            if len(value.strip()) == 0:
-                return create_error_response("AI requires a non-empty string", 422)
-            
-            # Security limit
-            if len(value) > MAX_AI_STRING_LENGTH:
-                return create_error_response(f"AI string must be <= {MAX_AI_STRING_LENGTH} characters", 422)
-            
-            ai_result = get_gemini_response(value)
-            
-            if "error" in ai_result:
-                return create_error_response(ai_result["error"], ai_result.get("status", 500))
-            
-            return create_success_response(ai_result["data"])
-    
+
+        return handler(value)
+
     except Exception as e:
         # Unexpected server error
         return create_error_response(f"Internal server error: {str(e)}", 500)
@@ -0,0 +1,13 @@
+import multiprocessing
+import os
+
+# Threaded workers so slow AI calls don't block CPU-bound requests
+workers = 2 * multiprocessing.cpu_count() + 1
+worker_class = 'gthread'
+threads = 4
+
+# Build the Fibonacci table, prime sieve, JIT kernel and Gemini model
+# once in the master process and share them copy-on-write with workers
+preload_app = True
+
+bind = '0.0.0.0:' + os.environ.get('PORT', '8000')